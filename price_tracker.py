@@ -1,17 +1,22 @@
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from selectolax.lexbor import LexborHTMLParser
 import smtplib
+import atexit
 import time
+import threading
 import configparser
 import logging
 import random
 import re
 from datetime import datetime
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from typing import Optional, Dict, Any
-import json
+from email.message import EmailMessage
+import string
+from typing import Optional, Dict, Any, Tuple
+import orjson
 import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 # Configure logging with UTF-8 encoding for emoji support
 logging.basicConfig(
@@ -38,23 +43,134 @@ if sys.platform.startswith('win'):
         pass
 logger = logging.getLogger(__name__)
 
-def safe_log(message):
-    """Log message with emoji fallback for console compatibility"""
-    try:
-        logger.info(message)
-    except UnicodeEncodeError:
-        # Strip emojis for console output if encoding fails
-        import re
-        clean_message = re.sub(r'[^\x00-\x7F]+', '', message)
-        logger.info(clean_message)
+_ASCII_STRIP = re.compile(r'[^\x00-\x7F]+')
+
+# The console handler writes to stderr; when it is UTF-8 no fallback is needed
+if (getattr(sys.stderr, 'encoding', None) or '').lower().startswith('utf'):
+    safe_log = logger.info
+else:
+    def safe_log(message):
+        """Log message with emoji fallback for console compatibility"""
+        try:
+            logger.info(message)
+        except UnicodeEncodeError:
+            # Strip emojis for console output if encoding fails
+            logger.info(_ASCII_STRIP.sub('', message))
+
+# Price formats in priority order: 123,456.78 / 123.45 / 123,45 (European) / 123
+_PRICE_RE = re.compile(r'\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+\.\d+|\d+,\d{2}(?!\d)|\d+')
+
+# Bot-detection phrases, matched case-insensitively in one pass over the raw page bytes
+_BOT_RE = re.compile(b'(?i)' + b'|'.join(re.escape(indicator) for indicator in (
+    b"robot check", b"blocked", b"captcha", b"unusual traffic",
+    b"automated queries", b"sorry, we just need to make sure you're not a robot",
+    b"enter the characters you see below", b"type the characters you see in this image"
+)))
+
+# Opening tag of a span with the a-offscreen class, used to locate the fast-path slice
+_OFFSCREEN_SPAN_RE = re.compile(rb'<span\s[^>]*\bclass="[^"]*\ba-offscreen\b')
+
+# Start/end markers of page regions whose text is not live markup
+_RAW_TEXT_MARKERS = ((b'<script', b'</script'), (b'<style', b'</style'), (b'<!--', b'-->'))
+
+def _in_raw_text(content: bytes, index: int) -> bool:
+    """Whether index falls inside a script, style or comment block"""
+    return any(content.rfind(start, 0, index) > content.rfind(end, 0, index)
+               for start, end in _RAW_TEXT_MARKERS)
 
 class AmazonPriceTracker:
+    # Long-running trackers keep a fixed set of attributes; no per-instance __dict__
+    __slots__ = (
+        'config', '_products', 'max_concurrent', 'session', 'price_history_file', 'price_history',
+        '_rng', '_stop', '_price_cache', 'cache_ttl', '_selector_hint', '_smtp'
+    )
+    
+    # Multiple price selectors for different Amazon layouts
+    PRICE_SELECTORS = (
+        'span.a-offscreen',
+        'span#priceblock_dealprice',
+        'span#priceblock_ourprice',
+        'span.a-price-whole',
+        'span.a-price.a-text-price.a-size-medium.apexPriceToPay',
+        'span.a-price-range',
+        '.a-price .a-offscreen',
+        '#corePrice_feature_div .a-price .a-offscreen',
+        '#apex_desktop .a-price .a-offscreen',
+        '.a-price-to-pay .a-offscreen',
+        '#priceblock_pactprice',
+        '.a-price.a-text-price.a-size-medium.apexPriceToPay .a-offscreen'
+    )
+    PRICE_SELECTOR_GROUP = ', '.join(PRICE_SELECTORS)
+    # Selectors that only hold the whole-dollar part of a price, never used as hints
+    WHOLE_DOLLAR_SELECTORS = ('span.a-price-whole',)
+    
+    # More diverse and recent user agents
+    USER_AGENTS = (
+        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+        'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+        'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:121.0) Gecko/20100101 Firefox/121.0',
+        'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.2 Safari/605.1.15',
+        'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Edge/120.0.0.0'
+    )
+    
+    # HTML alert email body, filled in by send_alert
+    _HTML_TMPL = string.Template("""
+    <html>
+      <body style="font-family: Arial, sans-serif; line-height: 1.5; max-width: 600px; margin: 0 auto;">
+        <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 20px; border-radius: 10px 10px 0 0;">
+          <h2 style="margin: 0;">🎯 Price Alert!</h2>
+        </div>
+        <div style="background: white; padding: 20px; border: 1px solid #ddd; border-radius: 0 0 10px 10px;">
+          <h3 style="color: #333; margin-top: 0;">${product_name}</h3>
+          <p style="font-size: 18px;">
+            Current Price: <strong style="color: #28a745; font-size: 24px;">$$${current_price}</strong><br>
+            Target Price: <strong>$$${target_price}</strong>
+          </p>
+          ${savings_text}
+          <div style="text-align: center; margin: 30px 0;">
+            <a href="${url}" style="background: #ff9500; color: white; padding: 15px 30px; text-decoration: none; border-radius: 5px; font-weight: bold; display: inline-block;">
+              🛒 Buy Now on Amazon
+            </a>
+          </div>
+          <hr style="border: none; border-top: 1px solid #eee; margin: 20px 0;">
+          <small style="color: #666;">
+            Amazon Price Tracker by Casey Dale Siatong<br>
+            Alert sent at ${sent_at}
+          </small>
+        </div>
+      </body>
+    </html>
+    """)
+    
+    # Bytes of page body parsed first; the rest is only read if no price is found there
+    MAX_PAGE_BYTES = 256 * 1024
+    
+    # Bytes of page parsed after the first a-offscreen match on the fast path
+    FAST_PATH_WINDOW = 10 * 1024
+    
     def __init__(self, config_file='config.ini'):
         self.config = self.load_config(config_file)
+        self._products = self.load_products()
+        self._rng = random.Random()
+        # Set on interrupt so worker threads abandon pacing delays and retries
+        self._stop = threading.Event()
+        self.max_concurrent = self.config.getint('tracking', 'max_concurrent', fallback=4)
         self.session = requests.Session()
-        self.setup_session()
+        # One pooled adapter for the tracker's lifetime so keep-alive connections
+        # are reused across retries and products; retries are handled in get_price
+        self.session.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=0))
+        self._build_static_headers()
         self.price_history_file = 'price_history.json'
         self.price_history = self.load_price_history()
+        # Recently fetched prices keyed by URL: {url: (price, fetched_at)}
+        self._price_cache = {}
+        self.cache_ttl = self.config.getint('tracking', 'cache_ttl', fallback=60)
+        # Price selector that last succeeded for each URL, tried first on the next check
+        self._selector_hint = {}
+        # SMTP connection kept open between alerts, closed on exit
+        self._smtp = None
+        atexit.register(self.close_smtp)
         
     def load_config(self, config_file):
         """Load and validate configuration"""
@@ -79,22 +195,29 @@ class AmazonPriceTracker:
         logger.info("Configuration loaded successfully")
         return config
     
-    def setup_session(self):
-        """Setup requests session with more sophisticated anti-detection measures"""
-        # More diverse and recent user agents
-        user_agents = [
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:121.0) Gecko/20100101 Firefox/121.0',
-            'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.2 Safari/605.1.15',
-            'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Edge/120.0.0.0'
-        ]
+    def load_products(self) -> Tuple[Tuple[str, str, float], ...]:
+        """Parse the products section once into (name, url, target_price) tuples"""
+        products = []
+        for product_name, product_config in self.config.items('products'):
+            parts = product_config.split(',', 1)
+            if len(parts) != 2:
+                logger.error(f"Invalid product config for {product_name}: {product_config}")
+                continue
+            
+            try:
+                target_price = float(parts[1].strip())
+            except ValueError as e:
+                logger.error(f"Invalid target price for {product_name}: {e}")
+                continue
+            
+            products.append((product_name, parts[0].strip(), target_price))
         
+        return tuple(products)
+    
+    def _build_static_headers(self):
+        """Set the browser headers that stay the same for every request"""
         # More realistic headers
-        self.session.headers.clear()
         self.session.headers.update({
-            'User-Agent': random.choice(user_agents),
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.9',
             'Accept-Encoding': 'gzip, deflate, br',
@@ -109,106 +232,129 @@ class AmazonPriceTracker:
             'sec-ch-ua-mobile': '?0',
             'sec-ch-ua-platform': '"Windows"'
         })
+    
+    def _rotate_headers(self) -> Dict[str, str]:
+        """Build the randomized per-request headers used for anti-detection"""
+        headers = {'User-Agent': self._rng.choice(self.USER_AGENTS)}
         
         # Add some randomization to avoid fingerprinting
-        if random.choice([True, False]):
-            self.session.headers['DNT'] = '1'
+        if self._rng.choice((True, False)):
+            headers['DNT'] = '1'
+        
+        return headers
+    
+    def _rotate_ua(self, headers: Dict[str, str]):
+        """Swap in a new User-Agent before retrying a request"""
+        headers['User-Agent'] = self._rng.choice(self.USER_AGENTS)
     
     def load_price_history(self):
         """Load price history from file"""
         if os.path.exists(self.price_history_file):
             try:
-                with open(self.price_history_file, 'r') as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, IOError):
+                with open(self.price_history_file, 'rb') as f:
+                    history = orjson.loads(f.read())
+                return {name: deque(entries, maxlen=100) for name, entries in history.items()}
+            except (orjson.JSONDecodeError, IOError, AttributeError, TypeError):
                 logger.warning("Could not load price history, starting fresh")
         return {}
     
     def save_price_history(self):
         """Save price history to file"""
+        history = {name: list(entries) for name, entries in self.price_history.items()}
+        tmp_file = self.price_history_file + '.tmp'
         try:
-            with open(self.price_history_file, 'w') as f:
-                json.dump(self.price_history, f, indent=2)
+            # Write to a temp file and swap it in so a crash never leaves a truncated history
+            with open(tmp_file, 'wb') as f:
+                f.write(orjson.dumps(history, option=orjson.OPT_INDENT_2))
+            os.replace(tmp_file, self.price_history_file)
         except IOError as e:
             logger.error(f"Could not save price history: {e}")
     
     def get_price(self, url: str, max_retries: int = 3) -> Optional[float]:
         """Get current price from Amazon with enhanced anti-detection"""
         
-        # Multiple price selectors for different Amazon layouts
-        price_selectors = [
-            'span.a-offscreen',
-            'span#priceblock_dealprice',
-            'span#priceblock_ourprice', 
-            'span.a-price-whole',
-            'span.a-price.a-text-price.a-size-medium.apexPriceToPay',
-            'span.a-price-range',
-            '.a-price .a-offscreen',
-            '#corePrice_feature_div .a-price .a-offscreen',
-            '#apex_desktop .a-price .a-offscreen',
-            '.a-price-to-pay .a-offscreen',
-            '#priceblock_pactprice',
-            '.a-price.a-text-price.a-size-medium.apexPriceToPay .a-offscreen'
-        ]
+        # Serve recently fetched prices without hitting Amazon again
+        cached = self._price_cache.get(url)
+        if cached and time.monotonic() - cached[1] < self.cache_ttl:
+            logger.info(f"Using cached price ${cached[0]} for {url}")
+            return cached[0]
+        
+        # Randomized headers for this product, passed per request so
+        # concurrent checks never share mutable session state
+        headers = self._rotate_headers()
+        
+        # Add referrer to look more natural
+        if 'amazon.com' in url:
+            headers['Referer'] = 'https://www.amazon.com/'
         
         for attempt in range(max_retries):
+            if self._stop.is_set():
+                return None
+            
             try:
                 # Short progressive delay with jitter
                 if attempt > 0:
                     base_delay = 2 + (attempt * 1.5)  # 2, 3.5, 5 seconds
-                    jitter = random.uniform(-0.5, 0.5)
+                    jitter = self._rng.uniform(-0.5, 0.5)
                     delay = max(1, base_delay + jitter)
                     logger.info(f"Retry {attempt + 1}, waiting {delay:.1f} seconds...")
-                    time.sleep(delay)
-                
-                # Refresh session and headers for each attempt
-                self.setup_session()
-                
-                # Add referrer to look more natural
-                if 'amazon.com' in url:
-                    self.session.headers['Referer'] = 'https://www.amazon.com/'
+                    if self._stop.wait(delay):
+                        return None
+                    
+                    # Only the User-Agent needs rotating after a failed attempt
+                    self._rotate_ua(headers)
                 
                 # Make request with longer timeout
-                response = self.session.get(url, timeout=20, allow_redirects=True)
-                response.raise_for_status()
+                response = self.session.get(url, headers=headers, timeout=20, stream=True, allow_redirects=True)
+                if response.status_code >= 400:
+                    logger.warning(f"Attempt {attempt + 1}: Request failed - HTTP {response.status_code} {response.reason}")
+                    response.close()
+                    continue
                 
-                # Enhanced bot detection
-                response_text = response.text.lower()
-                bot_indicators = [
-                    "robot check", "blocked", "captcha", "unusual traffic",
-                    "automated queries", "sorry, we just need to make sure you're not a robot",
-                    "enter the characters you see below", "type the characters you see in this image"
-                ]
+                hint = self._selector_hint.get(url)
+                price = selector = tree = None
+                try:
+                    # The price is near the top of the page, so read the start of the body first.
+                    # iter_content turns urllib3 read errors into requests exceptions.
+                    chunks = response.iter_content(self.MAX_PAGE_BYTES)
+                    content = next(chunks, b'')
+                    
+                    bot_detected = _BOT_RE.search(content) is not None
+                    if not bot_detected:
+                        price, selector, tree = self.find_content_price(content, hint)
+                        if price is None:
+                            # Some pages carry the price past the prefix, so fall back to the full body
+                            rest = b''.join(chunks)
+                            if rest:
+                                content += rest
+                                bot_detected = _BOT_RE.search(content) is not None
+                                if not bot_detected:
+                                    price, selector, tree = self.find_content_price(content, hint)
+                finally:
+                    response.close()
                 
-                if any(indicator in response_text for indicator in bot_indicators):
+                # Enhanced bot detection
+                if bot_detected:
                     logger.warning(f"Attempt {attempt + 1}: Bot detection triggered")
                     # Shorter delay when detected - only if we have more retries
                     if attempt < max_retries - 1:
-                        delay = random.uniform(10, 20)  # Reduced from 30-60 to 10-20 seconds
+                        delay = self._rng.uniform(10, 20)  # Reduced from 30-60 to 10-20 seconds
                         logger.info(f"Bot detected, waiting {delay:.1f} seconds before retry...")
-                        time.sleep(delay)
+                        if self._stop.wait(delay):
+                            return None
                     continue
                 
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Try each price selector
-                for selector in price_selectors:
-                    try:
-                        price_elements = soup.select(selector)
-                        for price_element in price_elements:
-                            if price_element:
-                                price_text = price_element.get_text().strip()
-                                price = self.parse_price(price_text)
-                                if price and self.validate_price(price):
-                                    logger.info(f"Found price ${price} using selector: {selector}")
-                                    return price
-                    except Exception as e:
-                        logger.debug(f"Error with selector {selector}: {e}")
-                        continue
+                if price is not None:
+                    logger.info(f"Found price ${price} using selector: {selector or self.PRICE_SELECTOR_GROUP}")
+                    self._price_cache[url] = (price, time.monotonic())
+                    # Only a single known selector that holds a full price is worth trying first next time
+                    if selector in self.PRICE_SELECTORS and selector not in self.WHOLE_DOLLAR_SELECTORS:
+                        self._selector_hint[url] = selector
+                    return price
                 
                 # If no price found, log page info for debugging
-                title_element = soup.find('title')
-                title = title_element.get_text() if title_element else "Unknown"
+                title_element = tree.css_first('title')
+                title = title_element.text() if title_element else "Unknown"
                 logger.warning(f"No price found on attempt {attempt + 1}. Page title: {title[:100]}...")
                 
                 # Check if we're on the right product page
@@ -225,32 +371,109 @@ class AmazonPriceTracker:
         logger.error(f"Failed to get price after {max_retries} attempts")
         return None
     
+    def find_content_price(self, content: bytes, hint: Optional[str] = None) -> Tuple[Optional[float], Optional[str], Optional[LexborHTMLParser]]:
+        """Find a price in page bytes, returning (price, selector, parsed tree or None)"""
+        # Fast path: the first selector matches on most pages, so try it
+        # on a small slice of the page before parsing the whole document
+        price = self.find_offscreen_price(content)
+        if price is not None:
+            return price, self.PRICE_SELECTORS[0], None
+        
+        tree = LexborHTMLParser(content)
+        price, selector = self.find_tree_price(tree, hint)
+        return price, selector, tree
+    
+    def find_offscreen_price(self, content: bytes) -> Optional[float]:
+        """Look for a valid price in the page slice around the first a-offscreen span"""
+        # First a-offscreen span in live markup; template copies inside
+        # scripts, styles or comments would not match in the full parse
+        for match in _OFFSCREEN_SPAN_RE.finditer(content):
+            if not _in_raw_text(content, match.start()):
+                break
+        else:
+            return None
+        
+        # Start at that span and parse only a small window
+        start = match.start()
+        tree = LexborHTMLParser(content[start:start + self.FAST_PATH_WINDOW])
+        
+        for price_element in tree.css(self.PRICE_SELECTORS[0]):
+            price = self.parse_price(price_element.text(deep=True).strip())
+            if price and self.validate_price(price):
+                return price
+        
+        return None
+    
+    def find_tree_price(self, tree: LexborHTMLParser, hint: Optional[str] = None) -> Tuple[Optional[float], Optional[str]]:
+        """Find the best valid price in a parsed page, returning (price, selector)"""
+        # Try the selector that last worked for this URL before the full query
+        if hint:
+            try:
+                price_elements = tree.css(hint)
+            except Exception as e:
+                logger.debug(f"Error with selector {hint}: {e}")
+                price_elements = []
+            for price_element in price_elements:
+                price = self.parse_price(price_element.text(deep=True).strip())
+                if price and self.validate_price(price):
+                    return price, hint
+        
+        # Query all price selectors as one selector group in a single tree walk
+        try:
+            price_elements = tree.css(self.PRICE_SELECTOR_GROUP)
+        except Exception as e:
+            logger.debug(f"Error with price selectors: {e}")
+            return None, None
+        
+        # Keep the valid price whose selector comes earliest in PRICE_SELECTORS,
+        # the same pick as trying each selector in turn over the whole page
+        best_price = None
+        best_priority = len(self.PRICE_SELECTORS)
+        for price_element in price_elements:
+            price = self.parse_price(price_element.text(deep=True).strip())
+            if not (price and self.validate_price(price)):
+                continue
+            
+            priority = self.selector_priority(price_element, best_priority)
+            if best_price is None or priority < best_priority:
+                best_price, best_priority = price, priority
+                if priority == 0:
+                    break
+        
+        if best_price is None:
+            return None, None
+        if best_priority < len(self.PRICE_SELECTORS):
+            return best_price, self.PRICE_SELECTORS[best_priority]
+        return best_price, None
+    
+    def selector_priority(self, price_element, limit: int) -> int:
+        """Index of the first PRICE_SELECTORS entry below limit that matches the element"""
+        for index, selector in enumerate(self.PRICE_SELECTORS[:limit]):
+            try:
+                if price_element.css_matches(selector):
+                    return index
+            except Exception as e:
+                logger.debug(f"Error matching selector {selector}: {e}")
+        return limit
+    
     def parse_price(self, price_text: str) -> Optional[float]:
         """Parse price from text with multiple formats"""
         if not price_text:
             return None
         
-        # Remove common currency symbols and clean text
-        cleaned = re.sub(r'[^\d.,\-]', '', price_text)
-        
-        # Handle different price formats
-        price_patterns = [
-            r'(\d+(?:,\d{3})*\.?\d*)',  # Standard format: 123,456.78
-            r'(\d+\.?\d*)',              # Simple format: 123.45
-            r'(\d+,\d+)',                # European format: 123,45
-        ]
+        # One scan over the raw text; currency symbols and spacing are skipped
+        match = _PRICE_RE.search(price_text)
+        if not match:
+            return None
         
-        for pattern in price_patterns:
-            match = re.search(pattern, cleaned)
-            if match:
-                try:
-                    price_str = match.group(1).replace(',', '')
-                    price = float(price_str)
-                    return price
-                except (ValueError, AttributeError):
-                    continue
+        price_str = match.group()
+        if '.' not in price_str and price_str[-3:-2] == ',':
+            # European format: a comma followed by exactly two digits is the decimal point
+            price_str = price_str.replace(',', '.')
+        else:
+            price_str = price_str.replace(',', '')
         
-        return None
+        return float(price_str)
     
     def validate_price(self, price: float) -> bool:
         """Validate that price is reasonable"""
@@ -258,8 +481,9 @@ class AmazonPriceTracker:
     
     def update_price_history(self, product_name: str, price: float):
         """Update price history for a product"""
+        # Keep only last 100 entries per product
         if product_name not in self.price_history:
-            self.price_history[product_name] = []
+            self.price_history[product_name] = deque(maxlen=100)
         
         entry = {
             'price': price,
@@ -267,10 +491,6 @@ class AmazonPriceTracker:
         }
         
         self.price_history[product_name].append(entry)
-        
-        # Keep only last 100 entries per product
-        if len(self.price_history[product_name]) > 100:
-            self.price_history[product_name] = self.price_history[product_name][-100:]
     
     def send_alert(self, product_name: str, current_price: float, target_price: float, url: str):
         """Send email alert via SendGrid SMTP"""
@@ -292,35 +512,16 @@ class AmazonPriceTracker:
                 savings_percent = (savings / previous_price) * 100
                 savings_text = f"<p>💰 <strong>You save ${savings:.2f} ({savings_percent:.1f}%)</strong> from the previous price of ${previous_price:.2f}</p>"
 
-            body = f"""
-            <html>
-              <body style="font-family: Arial, sans-serif; line-height: 1.5; max-width: 600px; margin: 0 auto;">
-                <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 20px; border-radius: 10px 10px 0 0;">
-                  <h2 style="margin: 0;">🎯 Price Alert!</h2>
-                </div>
-                <div style="background: white; padding: 20px; border: 1px solid #ddd; border-radius: 0 0 10px 10px;">
-                  <h3 style="color: #333; margin-top: 0;">{product_name}</h3>
-                  <p style="font-size: 18px;">
-                    Current Price: <strong style="color: #28a745; font-size: 24px;">${current_price:.2f}</strong><br>
-                    Target Price: <strong>${target_price:.2f}</strong>
-                  </p>
-                  {savings_text}
-                  <div style="text-align: center; margin: 30px 0;">
-                    <a href="{url}" style="background: #ff9500; color: white; padding: 15px 30px; text-decoration: none; border-radius: 5px; font-weight: bold; display: inline-block;">
-                      🛒 Buy Now on Amazon
-                    </a>
-                  </div>
-                  <hr style="border: none; border-top: 1px solid #eee; margin: 20px 0;">
-                  <small style="color: #666;">
-                    Amazon Price Tracker by Casey Dale Siatong<br>
-                    Alert sent at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-                  </small>
-                </div>
-              </body>
-            </html>
-            """
+            body = self._HTML_TMPL.substitute(
+                product_name=product_name,
+                current_price=f"{current_price:.2f}",
+                target_price=f"{target_price:.2f}",
+                savings_text=savings_text,
+                url=url,
+                sent_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            )
 
-            msg = MIMEMultipart("alternative")
+            msg = EmailMessage()
             msg["From"] = sender
             msg["To"] = recipient
             msg["Subject"] = subject
@@ -337,79 +538,115 @@ Buy now: {url}
 Amazon Price Tracker by Casey Dale Siatong
             """.strip()
             
-            msg.attach(MIMEText(text_fallback, "plain", "utf-8"))
-            msg.attach(MIMEText(body, "html", "utf-8"))
+            msg.set_content(text_fallback)
+            msg.add_alternative(body, subtype="html")
 
-            with smtplib.SMTP("smtp.sendgrid.net", 587) as server:
-                server.starttls()
-                server.login("apikey", api_key)
-                server.sendmail(sender, [recipient], msg.as_string())
+            self._get_smtp(api_key).sendmail(sender, [recipient], msg.as_bytes())
 
             logger.info(f"Alert sent successfully for {product_name}!")
             
         except Exception as e:
             logger.error(f"Failed to send email alert: {e}")
+    
+    def _get_smtp(self, api_key: str) -> smtplib.SMTP:
+        """Return a logged-in SendGrid connection, reconnecting if the cached one dropped"""
+        if self._smtp is not None:
+            try:
+                if self._smtp.noop()[0] == 250:
+                    return self._smtp
+            except (smtplib.SMTPException, OSError):
+                pass
+            self.close_smtp()
+        
+        # The timeout also bounds noop() on a connection silently dropped while idle
+        server = smtplib.SMTP("smtp.sendgrid.net", 587, timeout=30)
+        try:
+            server.starttls()
+            server.login("apikey", api_key)
+        except Exception:
+            server.close()
+            raise
+        
+        self._smtp = server
+        return server
+    
+    def close_smtp(self):
+        """Close the cached SMTP connection, if any"""
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            self._smtp.close()
+        self._smtp = None
+
+    def fetch_price(self, product_name: str, url: str, target_price: float, delay: float = 0) -> Optional[float]:
+        """Fetch the current price for one product, pausing first to pace its worker"""
+        if delay:
+            logger.info(f"Waiting {delay:.1f} seconds before checking {product_name}...")
+            if self._stop.wait(delay):
+                return None
+        
+        logger.info(f"Checking price for: {product_name}")
+        logger.info(f"Target price: ${target_price:.2f}")
+        
+        return self.get_price(url)
 
     def run_single_check(self):
         """Run a single price check cycle"""
         logger.info("Starting price check cycle")
         
-        if not self.config.has_section('products'):
-            logger.error("No products section found in config")
-            return
-        
-        products = dict(self.config.items('products'))
-        if not products:
+        if not self._products:
             logger.error("No products configured")
             return
         
         check_interval = self.config.getint('tracking', 'check_interval', fallback=30)
+        self._stop.clear()
         
-        for product_name, product_config in products.items():
-            try:
-                # Parse product configuration
-                parts = product_config.split(',', 1)
-                if len(parts) != 2:
-                    logger.error(f"Invalid product config for {product_name}: {product_config}")
-                    continue
-                
-                url = parts[0].strip()
-                target_price = float(parts[1].strip())
-                
-                logger.info(f"Checking price for: {product_name}")
-                logger.info(f"Target price: ${target_price:.2f}")
-                
-                current_price = self.get_price(url)
-                
-                if current_price is None:
-                    logger.error(f"Could not retrieve price for {product_name}")
-                    continue
-                
-                logger.info(f"Current price: ${current_price:.2f}")
-                
-                # Update price history
-                self.update_price_history(product_name, current_price)
-                
-                # Check if price dropped below target
-                if current_price <= target_price:
-                    safe_log(f"TARGET HIT! Price target hit for {product_name}!")
-                    self.send_alert(product_name, current_price, target_price, url)
-                else:
-                    logger.info(f"Price still above target (${current_price:.2f} > ${target_price:.2f})")
-                
-                # Save price history after each product
-                self.save_price_history()
+        # Each worker checks its products one after another with a random delay
+        # in between, so at most max_concurrent requests are in flight at once
+        workers = max(1, min(self.max_concurrent, len(self._products)))
+        
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = []
+                for index, (product_name, url, target_price) in enumerate(self._products):
+                    delay = 0
+                    if index >= workers:
+                        delay = self._rng.uniform(check_interval * 0.5, check_interval * 1.5)
+                    futures.append(executor.submit(self.fetch_price, product_name, url, target_price, delay))
                 
-                # Random delay between products to avoid detection
-                if len(products) > 1:
-                    delay = random.uniform(check_interval * 0.5, check_interval * 1.5)
-                    logger.info(f"Waiting {delay:.1f} seconds before next product...")
-                    time.sleep(delay)
-                    
-            except ValueError as e:
-                logger.error(f"Invalid target price for {product_name}: {e}")
-            except Exception as e:
-                logger.error(f"Error processing {product_name}: {e}")
+                try:
+                    for (product_name, url, target_price), future in zip(self._products, futures):
+                        try:
+                            current_price = future.result()
+                            
+                            if current_price is None:
+                                logger.error(f"Could not retrieve price for {product_name}")
+                                continue
+                            
+                            logger.info(f"Current price for {product_name}: ${current_price:.2f}")
+                            
+                            # Update price history
+                            self.update_price_history(product_name, current_price)
+                            
+                            # Check if price dropped below target
+                            if current_price <= target_price:
+                                safe_log(f"TARGET HIT! Price target hit for {product_name}!")
+                                self.send_alert(product_name, current_price, target_price, url)
+                            else:
+                                logger.info(f"Price still above target (${current_price:.2f} > ${target_price:.2f})")
+                            
+                        except Exception as e:
+                            logger.error(f"Error processing {product_name}: {e}")
+                except BaseException:
+                    # Don't let queued products (and their pacing delays) run after Ctrl-C
+                    self._stop.set()
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    raise
+        finally:
+            # Save price history once per cycle, including interrupted ones
+            self.save_price_history()
         
         logger.info("Price check cycle completed")
 